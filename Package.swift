@@ -0,0 +1,21 @@
+// swift-tools-version:5.7
+import PackageDescription
+
+let package = Package(
+    name: "EthereumTx",
+    platforms: [
+        .macOS(.v12),
+        .iOS(.v15),
+    ],
+    products: [
+        .library(name: "EthereumTx", targets: ["EthereumTx"]),
+    ],
+    dependencies: [
+        .package(url: "https://github.com/skywinder/web3swift.git", from: "2.6.0"),
+        .package(url: "https://github.com/attaswift/BigInt.git", from: "5.3.0"),
+    ],
+    targets: [
+        .target(name: "EthereumTx", dependencies: ["web3swift", "BigInt"]),
+        .testTarget(name: "EthereumTxTests", dependencies: ["EthereumTx", "web3swift", "BigInt"]),
+    ]
+)
@@ -0,0 +1,738 @@
+import Foundation
+import web3swift
+import BigInt
+
+public final class EthereumTransactionManager {
+    private let web3: web3
+    private let gate: RPCGate
+    private let sharedProvider: SharedProvider
+    private let session: URLSession
+    private var privateKeyData: Data
+    private let fromAddress: EthereumAddress
+    private let contractAddress: EthereumAddress
+    private let newHeadsURL: URL?
+    private let baseOptions: TransactionOptions
+    private let chainID: BigUInt?
+    
+    /// `bytes4(keccak256("transfer(address,uint256)"))`
+    private static let transferSelector = Data([0xa9, 0x05, 0x9c, 0xbb])
+    
+    /// newHeads subscriptions get their own session so a long-lived socket never shares the RPC session's
+    /// connection limit or its HTTP/2 connection.
+    private static let webSocketSession = URLSession(configuration: .default)
+    
+    private static var providerCache: [URL: SharedProvider] = [:]
+    private static let providerLock = NSLock()
+    
+    /// JSON-RPC codes a node answers with when it rejects the batch array itself.
+    private static let batchRejectionCodes: Set<Int> = [-32600, -32700]
+    
+    /// JSON-RPC codes providers use for rate limiting inside an otherwise successful HTTP reply.
+    private static let rateLimitCodes: Set<Int> = [-32005, 429]
+    
+    /// Highest padded `transfer` gas limit seen per chain and contract, with the margin (in percent) each was padded by.
+    private static var gasCache: [GasCacheKey: BigUInt] = [:]
+    private static var gasMarginPercent: [GasCacheKey: BigUInt] = [:]
+    private static let gasCacheLock = NSLock()
+    
+    /// Extra gas a transfer to an address with no token balance costs: a zero-to-nonzero SSTORE is 20,000 gas
+    /// against 2,900 for updating an existing balance.
+    private static let freshRecipientGas: BigUInt = 17_100
+    
+    /// Average block time in seconds, used to pace confirmation polls.
+    private static let blockTimeByChainID: [BigUInt: Double] = [1: 12.0, 5: 12.0, 137: 2.1, 42161: 0.25, 10: 2.0]
+    
+    public init?(privateKey: String, fromAddress: String, contractAddress: String, rpcURL: URL, maxConcurrentRequests: Int = 10) {
+        // JSON-RPC calls go over HTTPS; a wss:// endpoint is additionally used for newHeads notifications
+        let isWebSocket = rpcURL.scheme == "wss"
+        var httpComponents = URLComponents(url: rpcURL, resolvingAgainstBaseURL: false)
+        if isWebSocket {
+            httpComponents?.scheme = "https"
+        }
+        guard let from = EthereumAddress(fromAddress),
+              let contract = EthereumAddress(contractAddress),
+              let keyData = Self.fastHexDecode(privateKey),
+              // The key must belong to the account the transactions are sent from
+              let publicKey = Web3.Utils.privateToPublic(keyData),
+              Web3.Utils.publicToAddress(publicKey) == from,
+              let httpURL = httpComponents?.url,
+              let shared = Self.sharedWeb3(for: httpURL, maxConcurrentRequests: maxConcurrentRequests) else {
+            print("Failed to initialize EthereumTransactionManager")
+            return nil
+        }
+        
+        self.session = shared.web3.provider.session
+        self.fromAddress = from
+        self.contractAddress = contract
+        self.privateKeyData = keyData
+        self.web3 = shared.web3
+        self.gate = shared.gate
+        self.sharedProvider = shared
+        self.newHeadsURL = isWebSocket ? rpcURL : nil
+        // The provider resolves the network once when it is created
+        self.chainID = shared.web3.provider.network?.chainID
+        
+        var baseOptions = TransactionOptions.defaultOptions
+        baseOptions.from = from
+        baseOptions.to = contract
+        self.baseOptions = baseOptions
+    }
+    
+    deinit {
+        privateKeyData.resetBytes(in: 0..<privateKeyData.count)
+    }
+    
+    /// Decodes hex without per-character branches: `(c & 0x0F) + ((c & 0x40) >> 6) * 9` maps
+    /// '0'-'9', 'a'-'f' and 'A'-'F' to their nibble, eight characters at a time through `UInt64` loads.
+    static func fastHexDecode(_ s: String) -> Data? {
+        var string = s
+        return string.withUTF8 { chars -> Data? in
+            let start = chars.count >= 2 && chars[0] == 0x30 && chars[1] | 0x20 == 0x78 ? 2 : 0
+            guard (chars.count - start) % 2 == 0 else {
+                return nil
+            }
+            // Validate up front so the decoding loops below stay branch-free
+            for c in chars[start...] {
+                let lower = c | 0x20
+                guard (0x30...0x39).contains(c) || (0x61...0x66).contains(lower) else {
+                    return nil
+                }
+            }
+            
+            let src = UnsafeRawBufferPointer(rebasing: UnsafeRawBufferPointer(chars)[start...])
+            var out = Data(count: src.count / 2)
+            out.withUnsafeMutableBytes { dst in
+                var i = 0
+                var o = 0
+                // 8 ASCII characters -> 4 bytes per load, so a 64-char key takes 8 iterations
+                while i + 8 <= src.count {
+                    let word = UInt64(littleEndian: src.loadUnaligned(fromByteOffset: i, as: UInt64.self))
+                    let nibbles = (word & 0x0F0F_0F0F_0F0F_0F0F) &+ ((word & 0x4040_4040_4040_4040) >> 6) &* 9
+                    // Each 16-bit lane holds (high, low) nibbles; fold them into one byte, then pack the lanes
+                    var packed = (nibbles & 0x00FF_00FF_00FF_00FF) << 4 | (nibbles >> 8) & 0x00FF_00FF_00FF_00FF
+                    packed = (packed | packed >> 8) & 0x0000_FFFF_0000_FFFF
+                    packed = (packed | packed >> 16) & 0x0000_0000_FFFF_FFFF
+                    dst.storeBytes(of: UInt32(truncatingIfNeeded: packed).littleEndian, toByteOffset: o, as: UInt32.self)
+                    i += 8
+                    o += 4
+                }
+                while i < src.count {
+                    let hi = src[i]
+                    let lo = src[i + 1]
+                    dst[o] = ((hi & 0x0F) &+ ((hi & 0x40) >> 6) &* 9) << 4 | ((lo & 0x0F) &+ ((lo & 0x40) >> 6) &* 9)
+                    i += 2
+                    o += 1
+                }
+            }
+            return out
+        }
+    }
+    
+    /// Returns the `web3` instance for `rpcURL` and its request gate, creating both and a keep-alive
+    /// session on first use. The first manager for a URL decides its concurrency limit.
+    ///
+    /// Creating the provider makes a blocking `net_version` request, so it runs outside `providerLock`;
+    /// if two managers race on the same URL, the first entry cached wins.
+    private static func sharedWeb3(for rpcURL: URL, maxConcurrentRequests: Int) -> SharedProvider? {
+        providerLock.lock()
+        let cached = providerCache[rpcURL]
+        providerLock.unlock()
+        if let cached = cached {
+            return cached
+        }
+        
+        guard let provider = Web3HttpProvider(rpcURL, network: nil, keystoreManager: nil) else {
+            return nil
+        }
+        
+        // A keep-alive session that HTTP/2 multiplexes onto one connection; on HTTP/1.1 hosts it may open
+        // as many connections as the gate lets requests run at once
+        let configuration = URLSessionConfiguration.default
+        configuration.httpMaximumConnectionsPerHost = maxConcurrentRequests
+        configuration.timeoutIntervalForRequest = 30
+        // Confirmation polls are latency-sensitive request/response traffic
+        configuration.networkServiceType = .responsiveData
+        provider.session = URLSession(configuration: configuration, delegate: HTTPProtocolMonitor(), delegateQueue: nil)
+        
+        let shared = SharedProvider(web3: web3(provider: provider), gate: RPCGate(limit: maxConcurrentRequests))
+        
+        providerLock.lock()
+        defer { providerLock.unlock() }
+        if let winner = providerCache[rpcURL] {
+            provider.session.finishTasksAndInvalidate()
+            return winner
+        }
+        providerCache[rpcURL] = shared
+        return shared
+    }
+    
+    /// Whether the provider accepts JSON-RPC batches; shared by every manager on the same URL.
+    private var batchSupported: Bool {
+        get { sharedProvider.batchSupported }
+        set { sharedProvider.batchSupported = newValue }
+    }
+    
+    private var gasCacheKey: GasCacheKey {
+        GasCacheKey(chainID: chainID, contract: contractAddress.address.lowercased())
+    }
+    
+    private static func cachedGasLimit(for key: GasCacheKey) -> BigUInt? {
+        gasCacheLock.lock()
+        defer { gasCacheLock.unlock() }
+        return gasCache[key]
+    }
+    
+    /// Pads `estimate` by the key's safety margin (10% to begin with), but never below what a transfer to a fresh
+    /// recipient needs or below an earlier limit, then caches and returns it. The estimate only covers the recipient
+    /// it was made for, so the cached limit is a high-water mark for every later recipient.
+    private static func cacheGasLimit(_ estimate: BigUInt, for key: GasCacheKey) -> BigUInt {
+        gasCacheLock.lock()
+        defer { gasCacheLock.unlock() }
+        let padded = estimate * gasMarginPercent[key, default: 110] / 100
+        let gasLimit = max(padded, estimate + freshRecipientGas, gasCache[key] ?? 0)
+        gasCache[key] = gasLimit
+        return gasLimit
+    }
+    
+    /// Drops the cached limit after an out-of-gas failure and widens the margin for the next estimate.
+    private static func invalidateGasLimit(for key: GasCacheKey) {
+        gasCacheLock.lock()
+        defer { gasCacheLock.unlock() }
+        gasCache[key] = nil
+        gasMarginPercent[key] = min(gasMarginPercent[key, default: 110] + 10, 200)
+    }
+    
+    /// Runs one RPC call under the provider's concurrency limit.
+    private func gated<T>(_ call: () async throws -> T) async throws -> T {
+        await gate.acquire()
+        do {
+            let result = try await call()
+            await gate.release()
+            return result
+        } catch {
+            await gate.release()
+            throw error
+        }
+    }
+    
+    /// Broadcasts one transfer and returns its hash without waiting for it to be mined.
+    public func createAndBroadcastTransaction(to: String, amount: BigUInt) async throws -> String {
+        do {
+            let hashes = try await sendMany([Transfer(to: to, amount: amount)])
+            return hashes[0]
+        } catch TransactionError.broadcastFailed(_, let errors) where errors[0] != nil {
+            // With a single transfer the node's own error is more useful than the wrapper
+            throw errors[0]!
+        }
+    }
+    
+    /// Sends a burst of transfers with one parameter fetch and one broadcast batch and returns their hashes;
+    /// pass them to `awaitConfirmations(_:deadline:)` to wait for all of them on shared block notifications.
+    ///
+    /// Nonces are assigned locally from a single `eth_getTransactionCount`, so the transfers must be the
+    /// only transactions this account sends while the burst is in flight. If the node rejects some of them,
+    /// `TransactionError.broadcastFailed` carries the hashes of the ones that were sent and each rejection.
+    public func sendMany(_ transfers: [Transfer]) async throws -> [String] {
+        guard !transfers.isEmpty else {
+            return []
+        }
+        var calldata: [Data] = []
+        for transfer in transfers {
+            guard let toAddress = EthereumAddress(transfer.to) else {
+                throw TransactionError.invalidAddress
+            }
+            calldata.append(try Self.encodeTransfer(toAddress, transfer.amount))
+        }
+        
+        // Fetch nonce, gas price and, unless a previous send cached it, the gas limit in one round-trip
+        let cachedGasLimit = Self.cachedGasLimit(for: gasCacheKey)
+        let (nonce, gasPrice, estimatedGas) = try await fetchTxParams(calldata: calldata, needsGasEstimate: cachedGasLimit == nil)
+        guard let gasLimit = cachedGasLimit ?? estimatedGas.map({ Self.cacheGasLimit($0, for: gasCacheKey) }) else {
+            throw TransactionError.batchRequestFailed
+        }
+        
+        var transactions: [EthereumTransaction] = []
+        for (offset, data) in calldata.enumerated() {
+            // Prepare the transaction directly from the encoded calldata
+            var transaction = EthereumTransaction(
+                nonce: nonce + BigUInt(offset),
+                gasPrice: gasPrice,
+                gasLimit: gasLimit,
+                to: contractAddress,
+                value: 0,
+                data: data
+            )
+            
+            // Sign with the decoded key directly; there is no keystore to unlock
+            transaction.UNSAFE_setChainID(chainID)
+            do {
+                try transaction.sign(privateKey: privateKeyData, useExtraEntropy: false)
+            } catch {
+                throw TransactionError.failedToSignTransaction
+            }
+            transactions.append(transaction)
+        }
+        
+        return try await broadcast(transactions)
+    }
+    
+    /// Uses the JSON-RPC batch when the node accepts it, otherwise issues the calls concurrently.
+    /// The returned gas limit is the largest estimate across `calldata`, so one limit covers every transfer.
+    private func fetchTxParams(calldata: [Data], needsGasEstimate: Bool) async throws -> (nonce: BigUInt, gasPrice: BigUInt, gasLimit: BigUInt?) {
+        if batchSupported {
+            do {
+                return try await prefetchTxParams(calldata: calldata, needsGasEstimate: needsGasEstimate)
+            } catch TransactionError.batchNotSupported {
+                batchSupported = false
+            }
+        }
+        
+        async let nonce = gated { try await self.web3.eth.getTransactionCount(address: self.fromAddress, onBlock: "pending") }
+        async let gasPrice = gated { try await self.web3.eth.gasPrice() }
+        async let gasLimit: BigUInt? = needsGasEstimate ? maxGasEstimate(calldata) : nil
+        return try await (nonce, gasPrice, gasLimit)
+    }
+    
+    /// Sends `eth_getTransactionCount`, `eth_gasPrice` and, if needed, one `eth_estimateGas` per call as one JSON-RPC batch.
+    private func prefetchTxParams(calldata: [Data], needsGasEstimate: Bool) async throws -> (nonce: BigUInt, gasPrice: BigUInt, gasLimit: BigUInt?) {
+        var requests: [[String: Any]] = [
+            ["jsonrpc": "2.0", "id": 1, "method": "eth_getTransactionCount", "params": [fromAddress.address, "pending"]],
+            ["jsonrpc": "2.0", "id": 2, "method": "eth_gasPrice", "params": []]
+        ]
+        let estimateIDs = needsGasEstimate ? Array(3..<(3 + calldata.count)) : []
+        for (id, data) in zip(estimateIDs, calldata) {
+            let call: [String: Any] = [
+                "from": fromAddress.address,
+                "to": contractAddress.address,
+                "data": data.toHexString().addHexPrefix()
+            ]
+            requests.append(["jsonrpc": "2.0", "id": id, "method": "eth_estimateGas", "params": [call]])
+        }
+        let results = try await sendBatch(requests)
+        
+        guard let nonce = quantity(try Self.value(of: 1, in: results)),
+              let gasPrice = quantity(try Self.value(of: 2, in: results)) else {
+            throw TransactionError.batchRequestFailed
+        }
+        var gasLimit: BigUInt?
+        for id in estimateIDs {
+            // A reverting estimate surfaces the node's message, e.g. "transfer amount exceeds balance"
+            guard let estimate = quantity(try Self.value(of: id, in: results)) else {
+                throw TransactionError.batchRequestFailed
+            }
+            gasLimit = max(gasLimit ?? 0, estimate)
+        }
+        return (nonce, gasPrice, gasLimit)
+    }
+    
+    /// Broadcasts signed transactions as one `eth_sendRawTransaction` batch, or one by one in nonce order.
+    private func broadcast(_ transactions: [EthereumTransaction]) async throws -> [String] {
+        if batchSupported {
+            var requests: [[String: Any]] = []
+            for (id, transaction) in transactions.enumerated() {
+                guard let raw = transaction.encode() else {
+                    throw TransactionError.failedToSignTransaction
+                }
+                requests.append(["jsonrpc": "2.0", "id": id, "method": "eth_sendRawTransaction", "params": [raw.toHexString().addHexPrefix()]])
+            }
+            do {
+                let results = try await sendBatch(requests)
+                var hashes: [String?] = []
+                var errors: [Int: Error] = [:]
+                for id in transactions.indices {
+                    do {
+                        guard let hash = try Self.value(of: id, in: results) as? String else {
+                            throw TransactionError.batchRequestFailed
+                        }
+                        hashes.append(hash)
+                    } catch {
+                        hashes.append(nil)
+                        errors[id] = error
+                    }
+                }
+                guard errors.isEmpty else {
+                    throw TransactionError.broadcastFailed(hashes: hashes, errors: errors)
+                }
+                return hashes.compactMap { $0 }
+            } catch TransactionError.batchNotSupported {
+                batchSupported = false
+            }
+        }
+        
+        var hashes: [String] = []
+        for (index, transaction) in transactions.enumerated() {
+            do {
+                let result = try await gated { try await web3.eth.send(raw: transaction) }
+                hashes.append(result.transaction.txhash)
+            } catch {
+                // Later nonces would only queue behind the gap, so stop at the first rejection
+                let unsent = [String?](repeating: nil, count: transactions.count - index)
+                throw TransactionError.broadcastFailed(hashes: hashes + unsent, errors: [index: error])
+            }
+        }
+        return hashes
+    }
+    
+    /// POSTs a JSON-RPC body through the provider's session and returns the decoded reply.
+    private func post(_ body: Any) async throws -> Any {
+        var request = URLRequest(url: web3.provider.url)
+        request.httpMethod = "POST"
+        request.setValue("application/json", forHTTPHeaderField: "Content-Type")
+        request.httpBody = try JSONSerialization.data(withJSONObject: body)
+        
+        let (data, response) = try await gated { try await session.data(for: request) }
+        if let status = (response as? HTTPURLResponse)?.statusCode, status == 429 || (500...599).contains(status) {
+            // Rate limiting and server failures are transient and say nothing about the request itself
+            throw Web3Error.connectionError
+        }
+        return try JSONSerialization.jsonObject(with: data)
+    }
+    
+    /// Sends a single JSON-RPC call and returns its `result`, which is `NSNull` for a null result.
+    private func call(_ method: String, _ params: [Any]) async throws -> Any {
+        let json = try await post(["jsonrpc": "2.0", "id": 1, "method": method, "params": params] as [String: Any])
+        guard let response = json as? [String: Any] else {
+            throw TransactionError.batchRequestFailed
+        }
+        return try Self.outcome(of: response).get()
+    }
+    
+    /// POSTs a JSON-RPC batch through the provider's session and returns each entry's outcome keyed by request id.
+    private func sendBatch(_ requests: [[String: Any]]) async throws -> [Int: Result<Any, Error>] {
+        let json = try await post(requests)
+        if let single = json as? [String: Any] {
+            // Only a rejection of the array itself means the node cannot batch; anything else
+            // (a bad API key, -32000 ...) is an error for the caller
+            if let code = (single["error"] as? [String: Any])?["code"] as? Int, Self.batchRejectionCodes.contains(code) {
+                throw TransactionError.batchNotSupported
+            }
+            _ = try Self.outcome(of: single).get()
+            throw TransactionError.batchRequestFailed
+        }
+        guard let responses = json as? [[String: Any]] else {
+            throw TransactionError.batchRequestFailed
+        }
+        
+        var results: [Int: Result<Any, Error>] = [:]
+        for response in responses {
+            if let id = response["id"] as? Int {
+                results[id] = Self.outcome(of: response)
+            }
+        }
+        return results
+    }
+    
+    /// Returns the `result` of one JSON-RPC response object, or the error the node reported for it.
+    private static func outcome(of response: [String: Any]) -> Result<Any, Error> {
+        if let error = response["error"] as? [String: Any] {
+            if let code = error["code"] as? Int, rateLimitCodes.contains(code) {
+                return .failure(Web3Error.connectionError)
+            }
+            let message = error["message"] as? String ?? "Unknown JSON-RPC error"
+            return .failure(Web3Error.nodeError(desc: message))
+        }
+        return .success(response["result"] ?? NSNull())
+    }
+    
+    /// Whether `error` is a transport failure or rate limit worth retrying after a pause.
+    private static func isTransient(_ error: Error) -> Bool {
+        if case Web3Error.connectionError = error {
+            return true
+        }
+        return error is URLError
+    }
+    
+    /// Unwraps the batch entry with `id`, rethrowing the node's error for that entry.
+    private static func value(of id: Int, in results: [Int: Result<Any, Error>]) throws -> Any {
+        guard let result = results[id] else {
+            throw TransactionError.batchRequestFailed
+        }
+        return try result.get()
+    }
+    
+    private func quantity(_ value: Any?) -> BigUInt? {
+        guard let hex = value as? String else {
+            return nil
+        }
+        return BigUInt(hex.stripHexPrefix(), radix: 16)
+    }
+    
+    /// ABI-encodes `transfer(address,uint256)` locally: selector + 32-byte address + 32-byte amount.
+    /// Both words are assembled in stack tuples, so the 68-byte buffer is the only allocation.
+    /// Amounts wider than 256 bits throw `TransactionError.invalidAmount`.
+    static func encodeTransfer(_ to: EthereumAddress, _ amount: BigUInt) throws -> Data {
+        guard amount.bitWidth <= 256 else {
+            throw TransactionError.invalidAmount
+        }
+        var data = Data(capacity: 68)
+        data.append(Self.transferSelector)
+        Self.appendWord256(&data, to.addressData)
+        Self.appendUInt256(&data, amount)
+        return data
+    }
+    
+    /// Appends `bytes` left-padded with zeros to one 32-byte ABI word.
+    private static func appendWord256(_ data: inout Data, _ bytes: Data) {
+        var word: (UInt64, UInt64, UInt64, UInt64) = (0, 0, 0, 0)
+        withUnsafeMutableBytes(of: &word) { dst in
+            bytes.withUnsafeBytes { src in
+                UnsafeMutableRawBufferPointer(rebasing: dst[(32 - src.count)...]).copyMemory(from: src)
+            }
+        }
+        withUnsafeBytes(of: &word) { data.append(contentsOf: $0) }
+    }
+    
+    /// Appends `value` as a big-endian 256-bit ABI word built from its 64-bit limbs.
+    private static func appendUInt256(_ data: inout Data, _ value: BigUInt) {
+        let limbs = value.words
+        func limb(_ i: Int) -> UInt64 {
+            i < limbs.count ? UInt64(limbs[i]) : 0
+        }
+        var word = (limb(3).bigEndian, limb(2).bigEndian, limb(1).bigEndian, limb(0).bigEndian)
+        withUnsafeBytes(of: &word) { data.append(contentsOf: $0) }
+    }
+    
+    private func estimateGas(data: Data) async throws -> BigUInt {
+        let transaction = EthereumTransaction(to: contractAddress, data: data)
+        return try await gated { try await web3.eth.estimateGas(transaction, transactionOptions: baseOptions) }
+    }
+    
+    /// Estimates every call concurrently and returns the largest estimate.
+    private func maxGasEstimate(_ calldata: [Data]) async throws -> BigUInt {
+        try await withThrowingTaskGroup(of: BigUInt.self) { group in
+            for data in calldata {
+                group.addTask { try await self.estimateGas(data: data) }
+            }
+            return try await group.reduce(0) { max($0, $1) }
+        }
+    }
+    
+    /// Waits until `txHash` is mined, throwing if it reverts or is not seen before `deadline` seconds elapse.
+    public func awaitConfirmation(_ txHash: String, deadline: TimeInterval = 300, onAttempt: (@Sendable (Int) -> Void)? = nil) async throws {
+        do {
+            try await awaitConfirmations([txHash], deadline: deadline, onAttempt: onAttempt)
+        } catch TransactionError.confirmationFailed(let failed, _) {
+            throw failed.isEmpty ? TransactionError.transactionTimeout : TransactionError.transactionFailed
+        }
+    }
+    
+    /// Waits until every hash in `txHashes` is mined, polling once per block for all of them together.
+    /// Every receipt is checked before `TransactionError.confirmationFailed` reports the hashes that
+    /// reverted and the ones still unmined at the deadline.
+    ///
+    /// `onAttempt` is called with the number of every poll this wait makes, for callers that want progress updates.
+    public func awaitConfirmations(_ txHashes: [String], deadline: TimeInterval = 300, onAttempt: (@Sendable (Int) -> Void)? = nil) async throws {
+        let expiry = Date().addingTimeInterval(deadline)
+        
+        // Race the newHeads subscription against plain polling and take whichever sees every receipt first
+        let receipts = try await withThrowingTaskGroup(of: [String: Receipt]?.self) { group -> [String: Receipt]? in
+            if newHeadsURL != nil {
+                // A dropped subscription yields nil and leaves the poller running
+                group.addTask { try? await self.subscribeNewHeadsAndGetReceipts(txHashes) }
+            }
+            group.addTask { try await self.pollReceiptsWithBackoff(txHashes, until: expiry, onAttempt: onAttempt) }
+            
+            while let result = try await group.next() {
+                if let receipts = result {
+                    group.cancelAll()
+                    return receipts
+                }
+            }
+            return nil
+        }
+        
+        var failed: [String] = []
+        var timedOut: [String] = []
+        var ranOutOfGas = false
+        for txHash in txHashes {
+            guard let receipt = receipts?[txHash] else {
+                timedOut.append(txHash)
+                continue
+            }
+            guard receipt.succeeded else {
+                // Running out of gas burns the transaction's whole limit
+                if !ranOutOfGas,
+                   let transaction = try? await call("eth_getTransactionByHash", [txHash]) as? [String: Any],
+                   let gasLimit = quantity(transaction["gas"]), receipt.gasUsed >= gasLimit {
+                    ranOutOfGas = true
+                }
+                failed.append(txHash)
+                continue
+            }
+            print("Transaction confirmed: \(txHash)")
+        }
+        if ranOutOfGas {
+            // Re-estimate with a wider margin next time, once per burst
+            Self.invalidateGasLimit(for: gasCacheKey)
+        }
+        guard failed.isEmpty && timedOut.isEmpty else {
+            throw TransactionError.confirmationFailed(failed: failed, timedOut: timedOut)
+        }
+    }
+    
+    private func pollReceiptsWithBackoff(_ txHashes: [String], until expiry: Date, onAttempt: (@Sendable (Int) -> Void)?) async throws -> [String: Receipt] {
+        let blockTime = chainID.flatMap { Self.blockTimeByChainID[$0] } ?? 12.0
+        var delay = min(1.0, blockTime)
+        var attempt = 0
+        var lastBlockSeen: BigUInt?
+        var receipts: [String: Receipt] = [:]
+        while Date() < expiry {
+            try Task.checkCancellation()
+            attempt += 1
+            onAttempt?(attempt)
+            do {
+                // A receipt can only appear with a new block, so skip the lookup while the head is unchanged
+                guard let blockNumber = quantity(try await call("eth_blockNumber", [])) else {
+                    throw TransactionError.batchRequestFailed
+                }
+                if blockNumber != lastBlockSeen {
+                    try await fetchReceipts(txHashes, into: &receipts)
+                    if receipts.count == txHashes.count {
+                        return receipts
+                    }
+                    lastBlockSeen = blockNumber
+                }
+            } catch let error where Self.isTransient(error) {
+                // Transport failures and rate limiting get a longer pause instead of hammering the endpoint
+                delay = min(delay * 2, 30)
+            }
+            try await Task.sleep(nanoseconds: UInt64(Double.random(in: 0.8...1.2) * delay * 1_000_000_000))
+            delay = min(delay * 1.5, blockTime)
+        }
+        // The caller reports whatever is still missing at the deadline as timed out
+        return receipts
+    }
+    
+    /// Looks up every hash that has no receipt yet, as one batch or concurrently, and records the ones that have
+    /// been mined. A pending transaction has a `null` receipt.
+    private func fetchReceipts(_ txHashes: [String], into receipts: inout [String: Receipt]) async throws {
+        let pending = txHashes.filter { receipts[$0] == nil }
+        guard !pending.isEmpty else {
+            return
+        }
+        if batchSupported {
+            let requests: [[String: Any]] = pending.enumerated().map { id, txHash in
+                ["jsonrpc": "2.0", "id": id, "method": "eth_getTransactionReceipt", "params": [txHash]]
+            }
+            do {
+                let results = try await sendBatch(requests)
+                for (id, txHash) in pending.enumerated() {
+                    receipts[txHash] = Receipt(try Self.value(of: id, in: results))
+                }
+                return
+            } catch TransactionError.batchNotSupported {
+                batchSupported = false
+            }
+        }
+        
+        try await withThrowingTaskGroup(of: (String, Receipt?).self) { group in
+            for txHash in pending {
+                group.addTask { (txHash, Receipt(try await self.call("eth_getTransactionReceipt", [txHash]))) }
+            }
+            for try await (txHash, receipt) in group {
+                receipts[txHash] = receipt
+            }
+        }
+    }
+    
+    /// Re-checks the pending receipts on every block announced by an `eth_subscribe("newHeads")` subscription.
+    private func subscribeNewHeadsAndGetReceipts(_ txHashes: [String]) async throws -> [String: Receipt]? {
+        guard let url = newHeadsURL else {
+            return nil
+        }
+        let socket = Self.webSocketSession.webSocketTask(with: url)
+        socket.resume()
+        defer { socket.cancel(with: .goingAway, reason: nil) }
+        
+        return try await withTaskCancellationHandler {
+            try await socket.send(.string(#"{"jsonrpc":"2.0","id":1,"method":"eth_subscribe","params":["newHeads"]}"#))
+            // The first reply carries the subscription id, every later message is a new block header
+            _ = try await socket.receive()
+            var receipts: [String: Receipt] = [:]
+            while true {
+                _ = try await socket.receive()
+                try Task.checkCancellation()
+                try await fetchReceipts(txHashes, into: &receipts)
+                if receipts.count == txHashes.count {
+                    return receipts
+                }
+            }
+        } onCancel: {
+            socket.cancel(with: .goingAway, reason: nil)
+        }
+    }
+    
+    private struct GasCacheKey: Hashable {
+        let chainID: BigUInt?
+        let contract: String
+    }
+    
+    /// The fields of an `eth_getTransactionReceipt` result the confirmation checks need.
+    private struct Receipt {
+        let succeeded: Bool
+        let gasUsed: BigUInt
+        
+        /// Returns `nil` for the `null` result of a transaction that has not been mined yet.
+        init?(_ result: Any) {
+            guard let fields = result as? [String: Any],
+                  let status = fields["status"] as? String,
+                  let gasUsed = (fields["gasUsed"] as? String).flatMap({ BigUInt($0.stripHexPrefix(), radix: 16) }) else {
+                return nil
+            }
+            self.succeeded = BigUInt(status.stripHexPrefix(), radix: 16) == 1
+            self.gasUsed = gasUsed
+        }
+    }
+    
+    /// A provider shared by every manager on the same URL. `batchSupported` has its own lock so reading it
+    /// from async code never waits on `providerLock`.
+    private final class SharedProvider {
+        let web3: web3
+        let gate: RPCGate
+        private let lock = NSLock()
+        private var _batchSupported = true
+        
+        var batchSupported: Bool {
+            get {
+                lock.lock()
+                defer { lock.unlock() }
+                return _batchSupported
+            }
+            set {
+                lock.lock()
+                defer { lock.unlock() }
+                _batchSupported = newValue
+            }
+        }
+        
+        init(web3: web3, gate: RPCGate) {
+            self.web3 = web3
+            self.gate = gate
+        }
+    }
+    
+    public struct Transfer {
+        public let to: String
+        public let amount: BigUInt
+        
+        public init(to: String, amount: BigUInt) {
+            self.to = to
+            self.amount = amount
+        }
+    }
+    
+    public enum TransactionError: Error {
+        case invalidAddress
+        case invalidAmount
+        case failedToSignTransaction
+        case batchRequestFailed
+        case batchNotSupported
+        case transactionFailed
+        case transactionTimeout
+        /// Some transfers of a burst were rejected: `hashes` has the hash of every transfer that was sent
+        /// (`nil` for the rest, in input order) and `errors` the node's error for each rejected index.
+        case broadcastFailed(hashes: [String?], errors: [Int: Error])
+        /// Some transfers of a burst did not confirm: `failed` reverted and `timedOut` were not mined by the deadline.
+        case confirmationFailed(failed: [String], timedOut: [String])
+    }
+}
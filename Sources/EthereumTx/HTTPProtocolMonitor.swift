@@ -0,0 +1,26 @@
+import Foundation
+
+/// Session delegate that reports, once per host, a connection that fell back to HTTP/1.x.
+///
+/// The manager relies on HTTP/2 or HTTP/3 to multiplex batch requests and confirmation polls over one
+/// connection; on HTTP/1.1 each in-flight request needs a connection of its own.
+final class HTTPProtocolMonitor: NSObject, URLSessionTaskDelegate {
+    private let lock = NSLock()
+    private var reportedHosts: Set<String> = []
+    
+    func urlSession(_ session: URLSession, task: URLSessionTask, didFinishCollecting metrics: URLSessionTaskMetrics) {
+        guard let transaction = metrics.transactionMetrics.last,
+              let host = transaction.request.url?.host,
+              let protocolName = transaction.networkProtocolName,
+              // h2 and h3 both multiplex; only HTTP/1.x needs a connection per request
+              protocolName.lowercased().hasPrefix("http/1") else {
+            return
+        }
+        
+        lock.lock()
+        defer { lock.unlock() }
+        if reportedHosts.insert(host).inserted {
+            print("\(host) negotiated \(protocolName) instead of h2 or h3; concurrent RPC requests will each open a connection")
+        }
+    }
+}
@@ -0,0 +1,32 @@
+import Foundation
+
+/// Caps the number of JSON-RPC requests in flight against one provider.
+///
+/// Waiters are resumed in FIFO order as slots are released, so a burst of sends queues
+/// behind the limit instead of fanning out into rate-limit errors and retries.
+actor RPCGate {
+    private let limit: Int
+    private var inFlight = 0
+    private var waiters: [CheckedContinuation<Void, Never>] = []
+    
+    init(limit: Int) {
+        self.limit = max(1, limit)
+    }
+    
+    func acquire() async {
+        if inFlight < limit {
+            inFlight += 1
+            return
+        }
+        await withCheckedContinuation { waiters.append($0) }
+    }
+    
+    func release() {
+        if waiters.isEmpty {
+            inFlight -= 1
+        } else {
+            // Hand the slot straight to the next waiter
+            waiters.removeFirst().resume()
+        }
+    }
+}
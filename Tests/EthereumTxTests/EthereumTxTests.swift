@@ -0,0 +1,72 @@
+import XCTest
+import BigInt
+import web3swift
+@testable import EthereumTx
+
+final class FastHexDecodeTests: XCTestCase {
+    // 36 characters: four eight-character SWAR chunks plus a two-byte scalar tail
+    private let expected = Data([0x00, 0x11, 0x22, 0x33, 0x44, 0x55, 0x66, 0x77, 0x88,
+                                 0x99, 0xaa, 0xbb, 0xcc, 0xdd, 0xee, 0xff, 0xab, 0xcd])
+    
+    func testDecodesWithAndWithoutPrefix() {
+        XCTAssertEqual(EthereumTransactionManager.fastHexDecode("00112233445566778899aabbccddeeffabcd"), expected)
+        XCTAssertEqual(EthereumTransactionManager.fastHexDecode("0x00112233445566778899aabbccddeeffabcd"), expected)
+        XCTAssertEqual(EthereumTransactionManager.fastHexDecode("0X00112233445566778899aabbccddeeffabcd"), expected)
+    }
+    
+    func testDecodesUppercaseAndMixedCase() {
+        XCTAssertEqual(EthereumTransactionManager.fastHexDecode("0x00112233445566778899AABBCCDDEEFFABCD"), expected)
+        XCTAssertEqual(EthereumTransactionManager.fastHexDecode("0x00112233445566778899AaBbCcDdEeFfaBcD"), expected)
+    }
+    
+    func testDecodesEmptyAndShortInput() {
+        XCTAssertEqual(EthereumTransactionManager.fastHexDecode("0x"), Data())
+        XCTAssertEqual(EthereumTransactionManager.fastHexDecode("0f"), Data([0x0f]))
+    }
+    
+    func testRejectsOddLength() {
+        XCTAssertNil(EthereumTransactionManager.fastHexDecode("0xabc"))
+        XCTAssertNil(EthereumTransactionManager.fastHexDecode("001122334455667"))
+    }
+    
+    func testRejectsInvalidCharacters() {
+        XCTAssertNil(EthereumTransactionManager.fastHexDecode("0x0g"))
+        // ':' and 'G' would otherwise map to a nibble through the branch-free arithmetic
+        XCTAssertNil(EthereumTransactionManager.fastHexDecode("0x0011223:"))
+        XCTAssertNil(EthereumTransactionManager.fastHexDecode("00112233445566G7"))
+        // Even lengths, so the spaces reach the character check rather than the odd-length guard
+        XCTAssertNil(EthereumTransactionManager.fastHexDecode(" 0x000"))
+        XCTAssertNil(EthereumTransactionManager.fastHexDecode("0x000 "))
+    }
+}
+
+final class EncodeTransferTests: XCTestCase {
+    private let recipient = EthereumAddress("0x27F44B7dE8aBC05db1b3de48017DA84Ebc635be9")!
+    private let prefix = "a9059cbb00000000000000000000000027f44b7de8abc05db1b3de48017da84ebc635be9"
+    
+    private func encoded(_ amount: BigUInt) throws -> String {
+        try EthereumTransactionManager.encodeTransfer(recipient, amount).toHexString()
+    }
+    
+    func testEncodesZero() throws {
+        XCTAssertEqual(try encoded(0), prefix + "0000000000000000000000000000000000000000000000000000000000000000")
+    }
+    
+    func testEncodesAmountAcrossLimbs() throws {
+        let amount = (BigUInt(1) << 64) + 1
+        XCTAssertEqual(try encoded(amount), prefix + "0000000000000000000000000000000000000000000000010000000000000001")
+    }
+    
+    func testEncodesMaxUInt256() throws {
+        let amount = (BigUInt(1) << 256) - 1
+        XCTAssertEqual(try encoded(amount), prefix + "ffffffffffffffffffffffffffffffffffffffffffffffffffffffffffffffff")
+    }
+    
+    func testRejectsAmountsWiderThan256Bits() {
+        XCTAssertThrowsError(try EthereumTransactionManager.encodeTransfer(recipient, BigUInt(1) << 256)) { error in
+            guard case EthereumTransactionManager.TransactionError.invalidAmount = error else {
+                return XCTFail("Unexpected error \(error)")
+            }
+        }
+    }
+}